@@ -1,5 +1,6 @@
 import click
 from pathlib import Path
+from typing import Optional
 from .core import DumperConfig, RepositoryDumper
 from rich.console import Console
 
@@ -39,6 +40,20 @@ console = Console()
     default="utf-8",
     help="File encoding for reading repository files (default: utf-8)",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help=(
+        "Number of threads reading files; raise it on network filesystems "
+        "(default: based on CPU count)"
+    ),
+)
+@click.option(
+    "--gzip/--no-gzip",
+    default=False,
+    help="Compress output with gzip, adding .gz to the output path",
+)
 def main(
     repo_path: Path,
     output: Path,
@@ -46,9 +61,14 @@ def main(
     preamble: Path,
     no_tree: bool,
     encoding: str,
+    jobs: Optional[int],
+    gzip: bool,
 ) -> None:
     """Repod: Dump repository contents to single markdown file."""
     try:
+        if gzip and output.suffix != ".gz":
+            output = output.with_name(f"{output.name}.gz")
+
         config = DumperConfig(
             repo_path=repo_path,
             output_path=output,
@@ -56,6 +76,8 @@ def main(
             preamble_file=preamble,
             include_tree=not no_tree,
             encoding=encoding,
+            jobs=jobs,
+            gzip=gzip,
         )
 
         dumper = RepositoryDumper(config)
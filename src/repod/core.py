@@ -1,15 +1,112 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, TextIO
+from typing import Deque, Dict, FrozenSet, List, Optional, Set, TextIO, Tuple
+import codecs
 import fnmatch
+import gzip
+import io
 import logging
+import os
+import re
+import shutil
 from rich.console import Console
 from rich.progress import Progress
-from treelib import Tree
 
 logger = logging.getLogger(__name__)
 console = Console()
 
+# fnmatch.fnmatch is case-insensitive where the OS paths are
+_IGNORE_CASE = os.path.normcase("A") == "a"
+
+
+def _normcase(path: str) -> str:
+    """Fold case the way fnmatch does on this OS."""
+    return path.lower() if _IGNORE_CASE else path
+
+
+def _is_literal(pattern: str) -> bool:
+    """Check if a glob pattern contains no wildcards."""
+    return not any(c in pattern for c in "*?[")
+
+
+def _compile_patterns(patterns: List[str]) -> Tuple[re.Pattern, ...]:
+    """Compile glob patterns into a single regex matching any of them."""
+    if not patterns:
+        return ()
+    flags = re.IGNORECASE if _IGNORE_CASE else 0
+    return (
+        re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns), flags),
+    )
+
+
+@dataclass(frozen=True)
+class _IgnoreMatcher:
+    """Ignore patterns split by how cheaply they can be tested."""
+
+    exact: FrozenSet[str] = frozenset()
+    suffixes: Tuple[str, ...] = ()
+    prefixes: Tuple[str, ...] = ()
+    globs: Tuple[re.Pattern, ...] = ()
+    dir_globs: Tuple[re.Pattern, ...] = ()
+
+    @classmethod
+    def from_patterns(cls, patterns: List[str]) -> "_IgnoreMatcher":
+        """Build a matcher from glob patterns."""
+        # Most patterns are a plain name, "*<suffix>" or "<prefix>*" and can be
+        # tested with string operations; only the rest go through the regex.
+        exact: Set[str] = set()
+        suffixes: List[str] = []
+        prefixes: List[str] = []
+        globs: List[str] = []
+        for pattern in patterns:
+            literal = _normcase(pattern)
+            if _is_literal(pattern):
+                exact.add(literal)
+            elif pattern.startswith("*") and _is_literal(pattern[1:]):
+                suffixes.append(literal[1:])
+            elif pattern.endswith("*") and _is_literal(pattern[:-1]):
+                prefixes.append(literal[:-1])
+            else:
+                globs.append(pattern)
+        return cls(
+            exact=frozenset(exact),
+            suffixes=tuple(suffixes),
+            prefixes=tuple(prefixes),
+            globs=_compile_patterns(globs),
+            # a directory matching a pattern with a trailing "*" once "/" is
+            # appended has every descendant ignored too
+            dir_globs=_compile_patterns([p for p in globs if p.endswith("*")]),
+        )
+
+    def merge(self, other: "_IgnoreMatcher") -> "_IgnoreMatcher":
+        """Combine two matchers into one matching either's patterns."""
+        return _IgnoreMatcher(
+            exact=self.exact | other.exact,
+            suffixes=self.suffixes + other.suffixes,
+            prefixes=self.prefixes + other.prefixes,
+            globs=self.globs + other.globs,
+            dir_globs=self.dir_globs + other.dir_globs,
+        )
+
+    def ignores(self, path: str) -> bool:
+        """Check if a "/"-separated relative path matches any pattern."""
+        path = _normcase(path)
+        return (
+            path in self.exact
+            or path.endswith(self.suffixes)
+            or path.startswith(self.prefixes)
+            or any(r.match(path) is not None for r in self.globs)
+        )
+
+    def prunes(self, dir_path: str) -> bool:
+        """Check if everything below a "/"-separated directory path is ignored."""
+        path = _normcase(dir_path) + "/"
+        return path.startswith(self.prefixes) or any(
+            r.match(path) is not None for r in self.dir_globs
+        )
+
 
 @dataclass
 class DumperConfig:
@@ -21,6 +118,8 @@ class DumperConfig:
     preamble_file: Optional[Path] = None
     include_tree: bool = True
     encoding: str = "utf-8"
+    jobs: Optional[int] = None
+    gzip: bool = False
     default_preamble: str = """
     # Repository Content Dump
 
@@ -64,11 +163,24 @@ class RepositoryDumper:
         ".ps1": "powershell",
     }
 
+    # chunk size used when streaming file contents, and output buffer size
+    COPY_BUFSIZE = 1 << 20
+    # default threads reading files ahead of the writer, and how far ahead they go
+    MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+    READ_AHEAD = 64
+    # number of files written between progress bar updates
+    PROGRESS_STEP = 64
+
+    # bytes sniffed for NUL to detect binary files, and what replaces them
+    SNIFF_SIZE = 512
+    BINARY_PLACEHOLDER = "<binary omitted>"
+
     # default ignore patterns
     DEFAULT_IGNORE_PATTERNS = [
         # --- Project-specific files ---
         ".rpdignore",
         "repod.md",
+        "repod.md.gz",
         # --- Git-related files ---
         ".git/*",
         ".gitignore",
@@ -105,16 +217,49 @@ class RepositoryDumper:
         # --- Node.js dependencies ---
         "*/node_modules/*",
     ]
+    # built once per class; instances only prepare their own extra patterns
+    _DEFAULT_IGNORE_MATCHER = _IgnoreMatcher.from_patterns(DEFAULT_IGNORE_PATTERNS)
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # subclasses may override DEFAULT_IGNORE_PATTERNS
+        cls._DEFAULT_IGNORE_MATCHER = _IgnoreMatcher.from_patterns(
+            cls.DEFAULT_IGNORE_PATTERNS
+        )
 
     def __init__(self, config: DumperConfig):
         self.config = config
-        self.ignore_patterns = (
-            self.DEFAULT_IGNORE_PATTERNS + self._load_ignore_patterns()
+        user_patterns = self._load_ignore_patterns()
+        self.ignore_patterns = self.DEFAULT_IGNORE_PATTERNS + user_patterns
+        self._ignore_matcher = self._DEFAULT_IGNORE_MATCHER.merge(
+            _IgnoreMatcher.from_patterns(user_patterns)
+        )
+        self._preamble = self._load_preamble()
+        # UTF-16/32 text is full of NUL bytes, so it cannot be sniffed for them
+        self._sniff_binary = not codecs.lookup(config.encoding).name.startswith(
+            ("utf-16", "utf-32")
         )
 
-    def _get_file_language(self, file_path: Path) -> str:
-        """Get the language for a given file based on its extension."""
-        return self.EXT_TO_LANG.get(file_path.suffix.lower(), "")
+    def _get_file_language(self, file_name: str) -> str:
+        """Get the language for a given file name based on its extension."""
+        # same rule as PurePath.suffix: a leading dot does not start a suffix
+        i = file_name.rfind(".")
+        return self.EXT_TO_LANG.get(file_name[i:].lower(), "") if i > 0 else ""
+
+    def _load_preamble(self) -> str:
+        """Load the preamble text, falling back to the default one."""
+        if self.config.preamble_file:
+            try:
+                with open(
+                    self.config.preamble_file,
+                    "r",
+                    encoding=self.config.encoding,
+                    errors="ignore",
+                ) as pf:
+                    return pf.read().strip()
+            except Exception as e:
+                logger.error(f"Error reading preamble file: {e}")
+        return self.config.default_preamble
 
     def _load_ignore_patterns(self) -> List[str]:
         """Load ignore patterns from the ignore file."""
@@ -122,17 +267,11 @@ class RepositoryDumper:
             return []
 
         try:
-            with open(
-                self.config.ignore_file,
-                "r",
-                encoding=self.config.encoding,
-                errors="ignore",
-            ) as f:
-                return [
-                    line.strip()
-                    for line in f
-                    if line.strip() and not line.startswith("#")
-                ]
+            text = Path(self.config.ignore_file).read_text(
+                encoding=self.config.encoding, errors="ignore"
+            )
+            lines = (line.strip() for line in text.splitlines())
+            return [line for line in lines if line and not line.startswith("#")]
         except FileNotFoundError:
             logger.warning(f"Ignore file not found: {self.config.ignore_file}")
             return []
@@ -142,108 +281,180 @@ class RepositoryDumper:
 
     def _should_ignore(self, file_path: str) -> bool:
         """Check if a file should be ignored based on the ignore patterns."""
-        return any(
-            fnmatch.fnmatch(file_path, pattern) for pattern in self.ignore_patterns
-        )
-
-    def _generate_tree(self) -> str:
-        """Generate a tree structure of the repository."""
-        tree = Tree()
-        root_name = self.config.repo_path.name
-        tree.create_node(root_name, root_name)
-
-        def add_to_tree(parent_path: Path, parent_id: str) -> None:
-            items = sorted(
-                [
-                    x
-                    for x in parent_path.iterdir()
-                    if not self._should_ignore(
-                        str(x.relative_to(self.config.repo_path))
-                    )
-                ],
-                key=lambda x: (x.is_file(), x.name.lower()),
-            )
-
-            for item in items:
-                name = f"{item.name}/" if item.is_dir() else item.name
-                item_id = str(item.relative_to(self.config.repo_path))
-                tree.create_node(name, item_id, parent=parent_id)
-
-                if item.is_dir():
-                    add_to_tree(item, item_id)
-
-        add_to_tree(self.config.repo_path, root_name)
-        tree_str = tree.show(stdout=False)
-        assert isinstance(tree_str, str)
-        return f"```\n{tree_str}\n```\n"
+        if os.sep != "/":
+            file_path = file_path.replace(os.sep, "/")
+        return self._ignore_matcher.ignores(file_path)
+
+    def _should_prune(self, dir_path: str) -> bool:
+        """Check if everything below a directory is ignored."""
+        if os.sep != "/":
+            dir_path = dir_path.replace(os.sep, "/")
+        return self._ignore_matcher.prunes(dir_path)
+
+    def _scan(self) -> Tuple[Optional[str], List[Tuple[str, str, str]]]:
+        """Walk the repository once, rendering the tree and collecting files."""
+        repo_path = self.config.repo_path
+        tree: Optional[io.StringIO] = None
+        if self.config.include_tree:
+            tree = io.StringIO()
+            tree.write(f"{repo_path.name}\n")
+        # (path to open, path relative to the repository, language) per file
+        files: List[Tuple[str, str, str]] = []
 
-    def _write_preamble(self, output_file: TextIO) -> None:
-        """Write preamble and tree structure to output file."""
-        preamble = self.config.default_preamble
-        if self.config.preamble_file:
+        def walk(dir_path: str, rel_dir: str, prefix: str) -> None:
             try:
-                with open(
-                    self.config.preamble_file,
-                    "r",
-                    encoding=self.config.encoding,
-                    errors="ignore",
-                ) as pf:
-                    preamble = pf.read().strip()
-            except Exception as e:
-                logger.error(f"Error reading preamble file: {e}")
-
-        output_file.write(f"{preamble}\n\n")
+                with os.scandir(dir_path) as it:
+                    # read the directory flag from the dirent once and reuse it
+                    entries = [(e.is_dir(), e) for e in it]
+            except OSError as e:
+                logger.warning(f"Skipping unreadable directory {dir_path}: {e}")
+                return
+            entries.sort(key=lambda x: (not x[0], x[1].name.lower()))
+
+            # ignored entries (and everything below them) are dropped up front
+            # so the last visible sibling is known when drawing branches
+            items = []
+            for is_dir, entry in entries:
+                item_id = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                if not self._should_ignore(item_id):
+                    items.append((is_dir, entry, item_id))
+
+            for i, (is_dir, entry, item_id) in enumerate(items):
+                is_last = i == len(items) - 1
+                if tree is not None:
+                    branch = "└── " if is_last else "├── "
+                    name = f"{entry.name}/" if is_dir else entry.name
+                    tree.write(f"{prefix}{branch}{name}\n")
+
+                if is_dir:
+                    # symlinked directories are listed but not followed
+                    if entry.is_symlink() or self._should_prune(item_id):
+                        continue
+                    walk(entry.path, item_id, prefix + ("    " if is_last else "│   "))
+                elif entry.is_file():
+                    lang = self._get_file_language(entry.name)
+                    files.append((entry.path, item_id, lang))
+
+        walk(str(repo_path), "", "")
+        return (tree.getvalue() if tree is not None else None), files
+
+    def _write_preamble(self, output_file: TextIO, tree: Optional[str]) -> None:
+        """Write preamble and tree structure to output file."""
+        output_file.write(f"{self._preamble}\n\n")
 
-        if self.config.include_tree:
+        if tree is not None:
             output_file.write("## Repository Structure\n\n")
-            output_file.write(self._generate_tree())
+            output_file.write(f"```\n{tree}\n```\n")
             output_file.write("\n\n## File Contents\n\n")
 
+    def _read_file(self, file_path: str, lang: str) -> Optional[str]:
+        """Read a file for the dump.
+
+        Returns the file's text, BINARY_PLACEHOLDER if it looks binary, or None
+        if it is large enough to be streamed by the writer instead.
+        """
+        with open(file_path, "rb") as f:
+            # only files without a known language are sniffed for a NUL byte
+            if not lang and self._sniff_binary and b"\x00" in f.read(self.SNIFF_SIZE):
+                return self.BINARY_PLACEHOLDER
+            if os.fstat(f.fileno()).st_size > self.COPY_BUFSIZE:
+                return None
+            # decode from the start of the same handle, as text-mode open would
+            f.seek(0)
+            with io.TextIOWrapper(
+                f, encoding=self.config.encoding, errors="ignore"
+            ) as text:
+                return text.read()
+
     def _process_file(
-        self, file_path: Path, repo_root: Path, output_file: TextIO
+        self,
+        file_path: str,
+        relative_path: str,
+        lang: str,
+        output_file: TextIO,
+        content: "Future[Optional[str]]",
     ) -> None:
         """Process a single file and write its contents to the output file."""
         try:
-            relative_path = file_path.relative_to(repo_root)
-            if self._should_ignore(str(relative_path)):
+            text = content.result()
+            if text is not None:
+                output_file.write(f"### {relative_path}\n\n```{lang}\n{text}\n```\n\n")
                 return
 
             with open(
                 file_path, "r", encoding=self.config.encoding, errors="ignore"
             ) as f:
-                content = f.read()
-                lang = self._get_file_language(file_path)
-                output_file.write(f"### {relative_path}\n\n")
-                output_file.write(
-                    f"```{lang}\n{content}\n```\n\n"
-                    if lang
-                    else f"```\n{content}\n```\n\n"
-                )
+                output_file.write(f"### {relative_path}\n\n```{lang}\n")
+                shutil.copyfileobj(f, output_file, self.COPY_BUFSIZE)
+                output_file.write("\n```\n\n")
 
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}")
 
+    def _open_output(self) -> TextIO:
+        """Open the output file, gzip-compressed if configured."""
+        if self.config.gzip:
+            # level 1 gets most of the size reduction on source text cheaply
+            return gzip.open(
+                self.config.output_path,
+                "wt",
+                compresslevel=1,
+                encoding=self.config.encoding,
+            )
+        return open(
+            self.config.output_path,
+            "w",
+            encoding=self.config.encoding,
+            buffering=self.COPY_BUFSIZE,
+        )
+
     def dump(self) -> None:
         """Dump the repository contents to the output file."""
         try:
-            files = [f for f in self.config.repo_path.rglob("*") if f.is_file()]
+            tree, files = self._scan()
             total_files = len(files)
+            # on slow or network filesystems more reads in flight hide latency
+            jobs = self.config.jobs or self.MAX_WORKERS
+            read_ahead = max(self.READ_AHEAD, jobs)
 
-            with open(
-                self.config.output_path, "w", encoding=self.config.encoding
-            ) as output_file:
-                self._write_preamble(output_file)
+            with self._open_output() as output_file:
+                self._write_preamble(output_file, tree)
 
-                with Progress() as progress:
+                with (
+                    Progress() as progress,
+                    ThreadPoolExecutor(max_workers=jobs) as pool,
+                ):
                     task = progress.add_task(
                         "[cyan]Processing files...", total=total_files
                     )
 
-                    for file_path in files:
+                    # files are read ahead in the pool but written in walk order
+                    pending: Deque[Tuple[str, str, str, "Future[Optional[str]]"]] = (
+                        deque()
+                    )
+
+                    written = 0
+
+                    def write_next() -> None:
+                        nonlocal written
+                        file_path, relative_path, lang, content = pending.popleft()
                         self._process_file(
-                            file_path, self.config.repo_path, output_file
+                            file_path, relative_path, lang, output_file, content
                         )
-                        progress.update(task, advance=1)
+                        # the progress bar is refreshed in batches, not per file
+                        written += 1
+                        if written % self.PROGRESS_STEP == 0:
+                            progress.update(task, completed=written)
+
+                    for file_path, relative_path, lang in files:
+                        content = pool.submit(self._read_file, file_path, lang)
+                        pending.append((file_path, relative_path, lang, content))
+                        if len(pending) >= read_ahead:
+                            write_next()
+
+                    while pending:
+                        write_next()
+                    progress.update(task, completed=written)
 
             console.print(
                 f"\n[green]Repository contents written to {self.config.output_path}[/green]"